@@ -8,14 +8,24 @@ Quotation Tool.xlsx with dropdowns, formulas, and hidden data sheets.
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.utils import get_column_letter
+from openpyxl.utils import get_column_letter, coordinate_to_tuple
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.workbook.defined_name import DefinedName
 from openpyxl.formatting.rule import FormulaRule
+from collections import Counter, defaultdict, namedtuple
+from itertools import zip_longest
+import functools
 import re
 import glob
 import os
 import sys
 
+try:
+    # Optional: much faster reader for the source workbooks (falls back to openpyxl)
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
 # ── Configuration ──────────────────────────────────────────────────────────
 # Use the folder where the script/exe is located
 if getattr(sys, 'frozen', False):
@@ -53,6 +63,15 @@ print(f"  Tonnage file: {os.path.basename(FREIGHT_FILE)}")
 print(f"  Price List:   {os.path.basename(PRICE_FILE)}")
 print()
 
+# openpyxl streams the output through lxml when it is installed; without it
+# saving falls back to a pure-Python writer (~2x slower, more memory)
+try:
+    import lxml  # noqa: F401
+except ImportError:
+    print("  WARNING: lxml is not installed - saving the workbook will be slower.")
+    print("           Install it with: pip install lxml")
+    print()
+
 WEIGHT_TIERS = [19.5, 22, 23, 24, 25, 26, 27]
 PCS_START_COL = 11   # Column L in source (0-indexed)
 FOB_START_COL = 18   # Column S in source (0-indexed)
@@ -68,11 +87,20 @@ RESULT_FONT = Font(name='Calibri', size=11)
 WARNING_FONT = Font(name='Calibri', size=10, italic=True, color='CC0000')
 DETAIL_FONT_B = Font(name='Calibri', size=9, bold=True, color='666666')
 DETAIL_FONT = Font(name='Calibri', size=9, color='666666')
+DISPLAY_FONT = Font(name='Calibri', size=11, italic=True)
+BANNER_FONT = Font(name='Calibri', size=11, bold=True, color='FFFFFF')
 
 HEADER_FILL = PatternFill(start_color='1F4E79', end_color='1F4E79', fill_type='solid')
 INPUT_FILL = PatternFill(start_color='D6E4F0', end_color='D6E4F0', fill_type='solid')
 ALT_ROW_FILL = PatternFill(start_color='F2F7FB', end_color='F2F7FB', fill_type='solid')
 SECTION_FILL = PatternFill(start_color='E8EEF4', end_color='E8EEF4', fill_type='solid')
+DISPLAY_FILL = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
+NO_FILL = PatternFill()
+
+# Styles are immutable, so cells share these instead of building their own
+CENTER_ALIGN = Alignment(horizontal='center')
+CENTER_WRAP_ALIGN = Alignment(horizontal='center', wrap_text=True)
+VCENTER_ALIGN = Alignment(vertical='center')
 
 THIN_BORDER = Border(
     left=Side(style='thin', color='B0B0B0'),
@@ -83,131 +111,166 @@ THIN_BORDER = Border(
 
 
 # ── Parsing ────────────────────────────────────────────────────────────────
+# One pass over the description; the first match of each group wins.
+# EC codes stay case-sensitive (lowercase "tr"/"ft" are not EC levels).
+DESC_RE = re.compile(
+    r'(?P<size>(\d+)\s*[xX]\s*(\d+)\s*[xX]\s*(\d+))'
+    r'|(?P<chips>PLF\s*\d+|PRO\s*\d+|\d+mm)'
+    r'|(?P<ec>(?-i:\b(?:NW|WA|EW|TR|FT)\b))'
+    r'|(?P<plastic>P\d+Y)'
+    r'|(?P<no_holes>\bNO\s*HOLES\b)'
+    r'|(?P<holes>HOLES)'
+    r'|(?P<bsu>\bBSU\b)',
+    re.IGNORECASE,
+)
+CHIPS_NORM_RE = re.compile(r'(PLF|PRO)\s*(\d+)')
+
+Parsed = namedtuple('Parsed', 'size chips_pith ec_level plastic holes bsu')
+Product = namedtuple('Product', ('key', 'product_no', 'description', 'weight')
+                     + Parsed._fields + ('pcs', 'fob'))
+
+
+@functools.lru_cache(maxsize=4096)
 def parse_description(desc):
-    """Parse a GB product description into its component attributes."""
+    """Parse a GB product description into its component attributes.
+    Cached per raw description, so the result is immutable.
+    Returns (Parsed, key) where key is the 6-field lookup key
+    size|chips|ec|plastic|holes|bsu, or None for an empty description.
+    """
     if not desc:
         return None
     d = str(desc)
-    result = {
-        'size': '', 'chips_pith': '', 'ec_level': '',
-        'plastic': '', 'holes': 'N/A', 'bsu': 'N/A',
-    }
+    size = chips_pith = ec_level = plastic = ''
+    holes = bsu = 'N/A'
+
+    for m in DESC_RE.finditer(d):
+        kind = m.lastgroup
+        if kind == 'size':
+            # Size: e.g. 100x18x16
+            if not size:
+                size = f"{m.group(2)}X{m.group(3)}X{m.group(4)}"
+            # A size ending in "mm" (100x18x16mm) also carries the chips field
+            if not chips_pith and d[m.end():m.end() + 2].lower() == 'mm':
+                chips_pith = f"{m.group(4)}MM"
+        elif kind == 'chips':
+            # Chips/Pith: "16mm", "6mm", "PLF 3070", "PRO 8020"
+            if not chips_pith:
+                chips_pith = CHIPS_NORM_RE.sub(r'\1 \2', m.group(kind).upper())   # normalize spacing
+        elif kind == 'ec':
+            # EC Level: NW, WA, EW, TR, FT
+            if not ec_level:
+                ec_level = m.group(kind)
+        elif kind == 'plastic':
+            # Plastic duration: P1Y, P2Y, P3Y, P4Y, P5Y
+            if not plastic:
+                plastic = m.group(kind).upper()
+        elif kind == 'no_holes':
+            # NO HOLES beats HOLES wherever either appears
+            holes = 'NO HOLES'
+        elif kind == 'holes':
+            if holes == 'N/A':
+                holes = 'HOLES'
+        elif kind == 'bsu':
+            # BSU (Bottom Side Up)
+            bsu = 'BSU'
+
+    key = f"{size}|{chips_pith}|{ec_level}|{plastic}|{holes}|{bsu}"
+    # Few distinct values across hundreds of products: share one object each
+    size, chips_pith, ec_level, plastic = map(sys.intern, (size, chips_pith, ec_level, plastic))
+    return Parsed(size, chips_pith, ec_level, plastic, holes, bsu), key
+
+
+# ── Data readers ───────────────────────────────────────────────────────────
+def load_sheet_rows(filepath, sheets):
+    """Read cell values from one or more sheets of a source workbook.
+    sheets: {sheet_name: (min_row, max_col)}
+    Returns {sheet_name: [row tuples]} shaped like openpyxl's
+    iter_rows(values_only=True): every row has max_col values, None for empty.
+    Uses python-calamine when installed, otherwise openpyxl in read-only mode.
+    """
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(filepath)
+        return {
+            name: [_calamine_row(r, max_col)
+                   for r in wb.get_sheet_by_name(name).to_python(skip_empty_area=False)[min_row - 1:]]
+            for name, (min_row, max_col) in sheets.items()
+        }
 
-    # Size: e.g. 100x18x16
-    m = re.search(r'(\d+)\s*[xX]\s*(\d+)\s*[xX]\s*(\d+)', d)
-    if m:
-        result['size'] = f"{m.group(1)}X{m.group(2)}X{m.group(3)}"
-
-    # Chips/Pith: "16mm", "6mm", "PLF 3070", "PRO 8020"
-    m = re.search(r'(PLF\s*\d+|PRO\s*\d+|\d+mm)', d, re.IGNORECASE)
-    if m:
-        val = m.group(1).upper()
-        val = re.sub(r'(PLF|PRO)\s*(\d+)', r'\1 \2', val)   # normalize spacing
-        result['chips_pith'] = val
-
-    # EC Level: NW, WA, EW, TR, FT
-    m = re.search(r'\b(NW|WA|EW|TR|FT)\b', d)
-    if m:
-        result['ec_level'] = m.group(1)
-
-    # Plastic duration: P1Y, P2Y, P3Y, P4Y, P5Y
-    m = re.search(r'(P\d+Y)', d, re.IGNORECASE)
-    if m:
-        result['plastic'] = m.group(1).upper()
-
-    # Holes
-    if re.search(r'\bNO\s*HOLES\b', d, re.IGNORECASE):
-        result['holes'] = 'NO HOLES'
-    elif re.search(r'HOLES', d, re.IGNORECASE):
-        result['holes'] = 'HOLES'
-
-    # BSU (Bottom Side Up)
-    if re.search(r'\bBSU\b', d, re.IGNORECASE):
-        result['bsu'] = 'BSU'
-
-    return result
-
-
-def make_key(parsed):
-    """Build a 6-field lookup key."""
-    return (
-        f"{parsed['size']}|{parsed['chips_pith']}|{parsed['ec_level']}|"
-        f"{parsed['plastic']}|{parsed['holes']}|{parsed['bsu']}"
+    wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+    try:
+        return {
+            name: list(wb[name].iter_rows(min_row=min_row, max_col=max_col, values_only=True))
+            for name, (min_row, max_col) in sheets.items()
+        }
+    finally:
+        wb.close()
+
+
+def _calamine_row(row, max_col):
+    """Normalise a calamine row to openpyxl's values: '' -> None, 8000.0 -> 8000."""
+    values = tuple(
+        None if v == '' else int(v) if isinstance(v, float) and v.is_integer() else v
+        for v in row[:max_col]
     )
+    return values + (None,) * (max_col - len(values))
 
 
-# ── Data readers ───────────────────────────────────────────────────────────
-def read_product_sheet(wb, sheet_name):
-    """Read and parse one product sheet (e.g. IN-GB, SL-GB)."""
-    ws = wb[sheet_name]
+def read_product_sheet(rows):
+    """Parse one product sheet (e.g. IN-GB, SL-GB) from its rows A-Y,
+    starting at DATA_START_ROW.
+    """
     products = []
-    for row_idx in range(DATA_START_ROW, ws.max_row + 1):
-        row = [ws.cell(row=row_idx, column=c).value for c in range(1, 26)]  # A-Y
-        prod_no = row[0]
-        desc = row[1]
-        weight = row[3]
+    for row in rows:
+        prod_no, desc, _, weight = row[:4]
         if not prod_no or not desc:
             continue
 
-        parsed = parse_description(desc)
-        if not parsed:
+        parsed_key = parse_description(desc)
+        if not parsed_key:
             continue
+        parsed, key = parsed_key
+
+        # load_sheet_rows pads every row to max_col, so these are always 7-tuples
+        pcs = row[PCS_START_COL:PCS_START_COL + 7]
+        fob = row[FOB_START_COL:FOB_START_COL + 7]
 
-        pcs = [row[PCS_START_COL + i] if PCS_START_COL + i < len(row) else None for i in range(7)]
-        fob = [row[FOB_START_COL + i] if FOB_START_COL + i < len(row) else None for i in range(7)]
-
-        products.append({
-            'key': make_key(parsed),
-            'product_no': str(prod_no),
-            'description': str(desc),
-            'weight': weight,
-            **parsed,
-            'pcs': pcs,
-            'fob': fob,
-        })
+        products.append(Product(key, str(prod_no), str(desc), weight, *parsed, pcs, fob))
     return products
 
 
+TRANSIT_DAYS_RE = re.compile(r'(\d+)')
+
+
+def _parse_transit_days(tt):
+    """Return the first number in a transit time cell (e.g. "46 Days" -> 46), or None."""
+    text = str(tt).strip()
+    head = text.partition(' ')[0]
+    if head.isdecimal():     # fast path for the usual "<N> Days" format
+        return int(head)
+    tm = TRANSIT_DAYS_RE.search(text)
+    return int(tm.group(1)) if tm else None
+
+
 def read_freight(rate_filepath):
     """Read ALL IN freight rates from the quarterly RATE SHEET + transit times.
     Returns all 3 origins separately (Cochin, Tuticorin, Colombo).
     Returns dict: {(origin, destination): {origin, country, destination, transit_days, all_in_usd}}
     """
-    wb = openpyxl.load_workbook(rate_filepath, data_only=True)
-
-    # ── Read ALL IN 40DRY/40HDRY from RATE SHEET ──
-    ws_rate = wb['RATE SHEET']
-    rates = {}
-    for row in ws_rate.iter_rows(min_row=2, max_col=12, values_only=True):
-        origin = row[0]   # Column A
-        dest = row[1]     # Column B
-        all_in = row[11]  # Column L (ALL IN 40DRY/40HDRY)
+    sheets = load_sheet_rows(rate_filepath, {'RATE SHEET': (2, 12), 'Transit Time': (2, 11)})
+
+    # ── Read ALL IN 40DRY/40HDRY from RATE SHEET into the route map ──
+    route_map = {}
+    for row in sheets['RATE SHEET']:
+        origin, dest = row[0], row[1]   # Columns A, B
+        all_in = row[11]                # Column L (ALL IN 40DRY/40HDRY)
         if not origin or not dest or all_in is None:
             continue
-        origin = str(origin).strip()
-        dest = str(dest).strip()
+        # 3 origins x ~47 destinations: intern so every route shares the same strings
+        origin = sys.intern(str(origin).strip())
+        dest = sys.intern(str(dest).strip())
         if origin == dest:
             continue
-        rates[(origin, dest)] = float(all_in)
-
-    # ── Read transit times from Transit Time sheet ──
-    ws_tt = wb['Transit Time']
-    transit = {}
-    for row in ws_tt.iter_rows(min_row=2, values_only=True):
-        receipt = row[0]   # Column A: Receipt
-        delivery = row[3]  # Column D: Delivery
-        tt = row[10]       # Column K: Transit Time (e.g. "46 Days")
-        if not receipt or not delivery or not tt:
-            continue
-        key = (str(receipt).strip(), str(delivery).strip())
-        if key not in transit:
-            tm = re.search(r'(\d+)', str(tt))
-            if tm:
-                transit[key] = int(tm.group(1))
 
-    # ── Build route map with all 3 origins ──
-    route_map = {}
-    for (origin, dest), all_in in rates.items():
         if ', IN' in origin:
             country = 'India'
         elif ', LK' in origin:
@@ -215,18 +278,50 @@ def read_freight(rate_filepath):
         else:
             country = origin
 
-        transit_days = transit.get((origin, dest), 0)
-
         route_map[(origin, dest)] = {
             'origin': origin,
             'country': country,
             'destination': dest,
-            'transit_days': transit_days,
-            'all_in_usd': round(all_in, 2),
+            'transit_days': 0,   # filled from Transit Time below
+            'all_in_usd': round(float(all_in), 2),
         }
+
+    # ── Fill transit times from Transit Time sheet (first valid row per route wins) ──
+    timed = set()
+    for row in sheets['Transit Time']:
+        # Column A: Receipt, Column D: Delivery, Column K: Transit Time (e.g. "46 Days")
+        receipt, _, _, delivery, _, _, _, _, _, _, tt = row
+        if not receipt or not delivery or not tt:
+            continue
+        key = (str(receipt).strip(), str(delivery).strip())
+        route = route_map.get(key)
+        if route is None or key in timed:
+            continue
+        days = _parse_transit_days(tt)
+        if days is not None:
+            route['transit_days'] = days
+            timed.add(key)
     return route_map
 
 
+# Known misspellings in the client's Tonnage sheet (for report only — matching uses overrides)
+KNOWN_MISSPELLINGS = {
+    'yokohoma': 'Yokohama', 'lisbao': 'Lisboa/Lisbon', 'le harve': 'Le Havre',
+}
+
+# Override table for known name mismatches (freight_dest_lower -> tonnage_key)
+TONNAGE_OVERRIDES = {
+    'london gateway, gb': 'london gateway terminal',
+    'las palmas de gran canaria, es': 'las palmas',
+    'lisbon, pt': 'lisbao',
+    'guayaquil-posorja, ec': 'guayaquil',
+    'cartagena, es': 'cartagena',
+}
+
+# Cartagena, CO: tonnage says Spain, freight says Colombia — do NOT match
+TONNAGE_SKIP_MATCHES = frozenset({'cartagena, co'})
+
+
 def read_tonnage(filepath, freight_destinations):
     """Read tonnage data from the Tonnage sheet in Freight.xlsx.
     Uses only client-provided data (40HC entries).
@@ -235,43 +330,40 @@ def read_tonnage(filepath, freight_destinations):
         tonnage: dict {freight_destination: (gross_weight_mt, is_confirmed)}
         report: dict with quality_issues, matched, defaults lists
     """
-    wb = openpyxl.load_workbook(filepath)
-    ws = wb['Tonnage']
+    rows = load_sheet_rows(filepath, {'Tonnage': (3, 6)})['Tonnage']
 
     # ── Step 1: Read all 40HC entries, deduplicate ────────────────────────
     raw = {}  # cleaned_port_name -> (gross_weight, original_name, row_idx)
     quality_issues = []
 
-    for row_idx in range(3, ws.max_row + 1):
-        port = ws.cell(row=row_idx, column=1).value
-        country = ws.cell(row=row_idx, column=2).value
-        gross = ws.cell(row=row_idx, column=5).value
-        ctype = str(ws.cell(row=row_idx, column=6).value or '').strip()
+    for row_idx, row in enumerate(rows, start=3):
+        port, country, _, _, gross, ctype = row
+        ctype = str(ctype or '').strip()
 
         if not port or ctype != '40HC':
             continue
 
-        port_str = str(port).strip()
+        port_raw = str(port)
+        port_str = port_raw.strip()
+        port_lower = port_str.lower()
         country_str = str(country).strip() if country else ''
 
         # Detect swapped port/country (Germany/Hamburg)
-        if port_str.lower() == 'germany' and country_str.lower() == 'hamburg':
+        if port_lower == 'germany' and country_str.lower() == 'hamburg':
             quality_issues.append(
                 f"Row {row_idx}: Port/Country swapped: '{port_str}'/'{country_str}' -> Hamburg/Germany")
             port_str = 'Hamburg'
+            port_lower = 'hamburg'
 
         # Detect trailing whitespace
-        if str(port).rstrip() != str(port):
+        if port_raw[-1:].isspace():
             quality_issues.append(f"Row {row_idx}: Trailing whitespace in port name: '{port}'")
 
         # Detect misspellings (for report only — matching uses override table)
-        known_misspellings = {
-            'yokohoma': 'Yokohama', 'lisbao': 'Lisboa/Lisbon', 'le harve': 'Le Havre',
-        }
-        for wrong, correct in known_misspellings.items():
-            if port_str.lower() == wrong:
-                quality_issues.append(
-                    f"Row {row_idx}: Possible misspelling: '{port_str}' (should be {correct})")
+        correct = KNOWN_MISSPELLINGS.get(port_lower)
+        if correct:
+            quality_issues.append(
+                f"Row {row_idx}: Possible misspelling: '{port_str}' (should be {correct})")
 
         # Detect annotation in name
         if '**' in port_str or '(' in port_str:
@@ -282,34 +374,22 @@ def read_tonnage(filepath, freight_destinations):
             continue
 
         gross_val = float(gross)
-        key = port_str.lower()
-
-        if key in raw:
-            if gross_val > raw[key][0]:
-                quality_issues.append(
-                    f"Duplicate port '{port_str}' (row {row_idx}): keeping higher weight "
-                    f"{gross_val} over {raw[key][0]}")
-                raw[key] = (gross_val, port_str, row_idx)
-            else:
-                quality_issues.append(
-                    f"Duplicate port '{port_str}' (row {row_idx}): skipping lower weight "
-                    f"{gross_val} (keeping {raw[key][0]})")
-        else:
+        key = port_lower
+
+        prev = raw.get(key)
+        if prev is None:
             raw[key] = (gross_val, port_str, row_idx)
+        elif gross_val > prev[0]:
+            quality_issues.append(
+                f"Duplicate port '{port_str}' (row {row_idx}): keeping higher weight "
+                f"{gross_val} over {prev[0]}")
+            raw[key] = (gross_val, port_str, row_idx)
+        else:
+            quality_issues.append(
+                f"Duplicate port '{port_str}' (row {row_idx}): skipping lower weight "
+                f"{gross_val} (keeping {prev[0]})")
 
     # ── Step 2: Match tonnage ports to freight destinations ───────────────
-    # Override table for known name mismatches (freight_dest_lower -> tonnage_key)
-    OVERRIDES = {
-        'london gateway, gb': 'london gateway terminal',
-        'las palmas de gran canaria, es': 'las palmas',
-        'lisbon, pt': 'lisbao',
-        'guayaquil-posorja, ec': 'guayaquil',
-        'cartagena, es': 'cartagena',
-    }
-
-    # Cartagena, CO: tonnage says Spain, freight says Colombia — do NOT match
-    SKIP_MATCHES = {'cartagena, co'}
-
     tonnage = {}
     matched = []
     defaults = []
@@ -317,7 +397,7 @@ def read_tonnage(filepath, freight_destinations):
     for dest in freight_destinations:
         dest_lower = dest.lower()
 
-        if dest_lower in SKIP_MATCHES:
+        if dest_lower in TONNAGE_SKIP_MATCHES:
             quality_issues.append(
                 f"Cartagena: tonnage lists Spain but freight destination is '{dest}' (Colombia) — not matched")
             tonnage[dest] = (23, False)
@@ -325,7 +405,7 @@ def read_tonnage(filepath, freight_destinations):
             continue
 
         # Try override first
-        tonnage_key = OVERRIDES.get(dest_lower)
+        tonnage_key = TONNAGE_OVERRIDES.get(dest_lower)
 
         # Try extracting city name from "City, CC" format
         if tonnage_key is None:
@@ -354,21 +434,25 @@ def read_tonnage(filepath, freight_destinations):
 
 # ── Workbook builder ───────────────────────────────────────────────────────
 def build_tool(in_products, sl_products, freight, tonnage):
-    wb = openpyxl.Workbook()
+    # Write-only: every sheet streams its rows straight to disk on save
+    wb = openpyxl.Workbook(write_only=True)
 
     # ── 1. Collect unique values for dropdowns ─────────────────────────────
-    all_products = in_products + sl_products
-    sizes = sorted({p['size'] for p in all_products if p['size']})
-    chips = sorted({p['chips_pith'] for p in all_products if p['chips_pith']})
-    ecs = sorted({p['ec_level'] for p in all_products if p['ec_level']})
-    plastics = sorted({p['plastic'] for p in all_products if p['plastic']})
-    holes_vals = sorted({p['holes'] for p in all_products})      # HOLES, NO HOLES, N/A
-    bsu_vals = sorted({p['bsu'] for p in all_products})           # BSU, N/A
+    sizes, chips, ecs, plastics, holes_vals, bsu_vals = set(), set(), set(), set(), set(), set()
+    for p in in_products + sl_products:
+        sizes.add(p.size)
+        chips.add(p.chips_pith)
+        ecs.add(p.ec_level)
+        plastics.add(p.plastic)
+        holes_vals.add(p.holes)      # HOLES, NO HOLES, N/A
+        bsu_vals.add(p.bsu)          # BSU, N/A
+    # Blank attributes are not selectable (holes/BSU always have a value)
+    sizes, chips, ecs, plastics = (sorted(v - {''}) for v in (sizes, chips, ecs, plastics))
+    holes_vals, bsu_vals = sorted(holes_vals), sorted(bsu_vals)
     destinations = sorted({v['destination'] for v in freight.values()})
 
     # ── 2. Create Lists sheet ──────────────────────────────────────────────
-    ws_lists = wb.active
-    ws_lists.title = 'Lists'
+    ws_lists = wb.create_sheet('Lists')
     list_cols = {
         'A': ('Size', sizes),
         'B': ('Chips_Pith', chips),
@@ -379,11 +463,9 @@ def build_tool(in_products, sl_products, freight, tonnage):
         'G': ('Destination', destinations),
         'H': ('Weight_MT', WEIGHT_TIERS),
     }
-    for col_letter, (header, values) in list_cols.items():
-        col_idx = ord(col_letter) - ord('A') + 1
-        ws_lists.cell(row=1, column=col_idx, value=header)
-        for r, val in enumerate(values, 2):
-            ws_lists.cell(row=r, column=col_idx, value=val)
+    ws_lists.append([header for header, _ in list_cols.values()])
+    for row in zip_longest(*(values for _, values in list_cols.values())):
+        ws_lists.append(row)
 
     # ── 3. Write product data sheets ───────────────────────────────────────
     ws_in = wb.create_sheet('IN_GB')
@@ -396,20 +478,15 @@ def build_tool(in_products, sl_products, freight, tonnage):
     ws_fr = wb.create_sheet('Freight')
     fr_headers = ['Key', 'Country', 'Origin', 'Destination', 'Transit_Days',
                   'All_In_USD', 'Gross_Weight_MT', 'Weight_Confirmed']
-    for c, h in enumerate(fr_headers, 1):
-        ws_fr.cell(row=1, column=c, value=h)
+    ws_fr.append(fr_headers)
     fr_rows = sorted(freight.values(), key=lambda x: (x['origin'], x['destination']))
-    for r, fr in enumerate(fr_rows, 2):
+    for fr in fr_rows:
         dest = fr['destination']
         gross_wt, confirmed = tonnage.get(dest, (23, False))
-        ws_fr.cell(row=r, column=1, value=f"{fr['origin']}|{fr['destination']}")
-        ws_fr.cell(row=r, column=2, value=fr['country'])
-        ws_fr.cell(row=r, column=3, value=fr['origin'])
-        ws_fr.cell(row=r, column=4, value=fr['destination'])
-        ws_fr.cell(row=r, column=5, value=fr['transit_days'])
-        ws_fr.cell(row=r, column=6, value=fr['all_in_usd'])
-        ws_fr.cell(row=r, column=7, value=gross_wt)
-        ws_fr.cell(row=r, column=8, value=1 if confirmed else 0)
+        ws_fr.append([
+            f"{fr['origin']}|{dest}", fr['country'], fr['origin'], dest,
+            fr['transit_days'], fr['all_in_usd'], gross_wt, 1 if confirmed else 0,
+        ])
     fr_last = len(fr_rows) + 1
 
     # ── 5. Define named ranges ─────────────────────────────────────────────
@@ -472,27 +549,29 @@ def _write_product_sheet(ws, products):
         'PCS@19.5', 'PCS@22', 'PCS@23', 'PCS@24', 'PCS@25', 'PCS@26', 'PCS@27',
         'FOB@19.5', 'FOB@22', 'FOB@23', 'FOB@24', 'FOB@25', 'FOB@26', 'FOB@27',
     ]
-    for c, h in enumerate(headers, 1):
-        ws.cell(row=1, column=c, value=h)
-
-    for r, p in enumerate(products, 2):
-        ws.cell(row=r, column=1, value=p['key'])
-        ws.cell(row=r, column=2, value=p['product_no'])
-        ws.cell(row=r, column=3, value=p['description'])
-        ws.cell(row=r, column=4, value=p['weight'])
-        ws.cell(row=r, column=5, value=p['size'])
-        ws.cell(row=r, column=6, value=p['chips_pith'])
-        ws.cell(row=r, column=7, value=p['ec_level'])
-        ws.cell(row=r, column=8, value=p['plastic'])
-        ws.cell(row=r, column=9, value=p['holes'])
-        ws.cell(row=r, column=10, value=p['bsu'])
-        for i in range(7):
-            ws.cell(row=r, column=11 + i, value=p['pcs'][i])   # K-Q
-            ws.cell(row=r, column=18 + i, value=p['fob'][i])   # R-X
+    ws.append(headers)
+
+    for p in products:
+        ws.append([
+            p.key, p.product_no, p.description, p.weight,
+            p.size, p.chips_pith, p.ec_level, p.plastic, p.holes, p.bsu,
+            *p.pcs,   # K-Q
+            *p.fob,   # R-X
+        ])
 
 
 def _build_quote_sheet(ws):
-    """Build the user-facing Quote sheet with inputs, outputs, and formulas."""
+    """Build the user-facing Quote sheet with inputs, outputs, and formulas.
+    The sheet is write-only, so cells are collected in `cells` as they are
+    laid out and streamed in row order at the end.
+    """
+    cells = defaultdict(dict)   # row -> {col: WriteOnlyCell}
+
+    def put(coord, value=None):
+        c = WriteOnlyCell(ws, value=value)
+        row, col = coordinate_to_tuple(coord)
+        cells[row][col] = c
+        return c
 
     # Column widths
     col_widths = {'A': 30, 'B': 24, 'C': 20, 'D': 20, 'E': 20,
@@ -501,18 +580,18 @@ def _build_quote_sheet(ws):
         ws.column_dimensions[col].width = w
 
     # ── Title ──────────────────────────────────────────────────────────────
-    ws.merge_cells('A1:I1')
-    ws['A1'].value = 'QUOTATION TOOL  --  GB Products'
-    ws['A1'].font = TITLE_FONT
-    ws['A1'].alignment = Alignment(vertical='center')
+    ws.merged_cells.add('A1:I1')
+    c = put('A1', 'QUOTATION TOOL  --  GB Products')
+    c.font = TITLE_FONT
+    c.alignment = VCENTER_ALIGN
     ws.row_dimensions[1].height = 35
 
     # ── Input section ──────────────────────────────────────────────────────
-    ws.merge_cells('A3:B3')
-    ws['A3'].value = 'INPUT PARAMETERS'
-    ws['A3'].font = SECTION_FONT
-    ws['A3'].fill = SECTION_FILL
-    ws['B3'].fill = SECTION_FILL
+    ws.merged_cells.add('A3:B3')
+    c = put('A3', 'INPUT PARAMETERS')
+    c.font = SECTION_FONT
+    c.fill = SECTION_FILL
+    put('B3').fill = SECTION_FILL
 
     # Dropdown inputs  (row, label, named_range)
     inputs = [
@@ -525,70 +604,68 @@ def _build_quote_sheet(ws):
         (10, 'Port of Destination',         'DestList'),
     ]
     for row, label, list_name in inputs:
-        ws.cell(row=row, column=1, value=label).font = LABEL_FONT
-        cell_b = ws.cell(row=row, column=2)
+        put(f'A{row}', label).font = LABEL_FONT
+        cell_b = put(f'B{row}')
         cell_b.fill = INPUT_FILL
         cell_b.font = INPUT_FONT
         cell_b.border = THIN_BORDER
-        cell_b.alignment = Alignment(horizontal='center')
+        cell_b.alignment = CENTER_ALIGN
         dv = DataValidation(type='list', formula1=f'={list_name}', allow_blank=True)
         dv.error = 'Please select a value from the dropdown list.'
         dv.errorTitle = 'Invalid Input'
         dv.prompt = f'Select {label}'
         dv.promptTitle = label
-        ws.add_data_validation(dv)
-        dv.add(cell_b)
+        ws.data_validations.append(dv)
+        dv.add(f'B{row}')
 
     # Row 11: Auto-derived weight tier (display-only, not a dropdown)
-    DISPLAY_FILL = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
-    ws.cell(row=11, column=1, value='Container Gross Weight (MT)').font = LABEL_FONT
-    wt_cell = ws.cell(row=11, column=2)
-    wt_cell.value = '=IF(B10="","",IF(K5=0,"N/A",INDEX(WeightTiers,K5)&" MT"&IF(K13=0," (UNCONFIRMED)","")))'
+    put('A11', 'Container Gross Weight (MT)').font = LABEL_FONT
+    wt_cell = put('B11', '=IF(B10="","",IF(K5=0,"N/A",INDEX(WeightTiers,K5)&" MT"&IF(K13=0," (UNCONFIRMED)","")))')
     wt_cell.fill = DISPLAY_FILL
-    wt_cell.font = Font(name='Calibri', size=11, italic=True)
+    wt_cell.font = DISPLAY_FONT
     wt_cell.border = THIN_BORDER
-    wt_cell.alignment = Alignment(horizontal='center')
+    wt_cell.alignment = CENTER_ALIGN
 
     # Row 12: Discount percentage (manual entry, default 30%)
-    ws.cell(row=12, column=1, value='Discount (%)').font = LABEL_FONT
-    disc = ws.cell(row=12, column=2, value=0.30)
+    put('A12', 'Discount (%)').font = LABEL_FONT
+    disc = put('B12', 0.30)
     disc.fill = INPUT_FILL
     disc.font = INPUT_FONT
     disc.border = THIN_BORDER
-    disc.alignment = Alignment(horizontal='center')
+    disc.alignment = CENTER_ALIGN
     disc.number_format = '0%'
 
     # ── Helper cells (column K, hidden) ────────────────────────────────────
     # K4: lookup key (6 fields)
-    ws['K4'] = '=B4&"|"&B5&"|"&B6&"|"&B7&"|"&B8&"|"&B9'
+    put('K4', '=B4&"|"&B5&"|"&B6&"|"&B7&"|"&B8&"|"&B9')
     # K5: weight tier index — approximate match (largest tier <= gross weight)
-    ws['K5'] = '=IFERROR(MATCH(K12,WeightTiers,1),0)'
+    put('K5', '=IFERROR(MATCH(K12,WeightTiers,1),0)')
     # K6: all required inputs filled? (7 inputs — weight is auto-derived)
-    ws['K6'] = '=AND(B4<>"",B5<>"",B6<>"",B7<>"",B8<>"",B9<>"",B10<>"")'
+    put('K6', '=AND(B4<>"",B5<>"",B6<>"",B7<>"",B8<>"",B9<>"",B10<>"")')
     # K7: India product match row
-    ws['K7'] = '=IFERROR(MATCH(K4,IN_Keys,0),0)'
+    put('K7', '=IFERROR(MATCH(K4,IN_Keys,0),0)')
     # K8: Sri Lanka product match row
-    ws['K8'] = '=IFERROR(MATCH(K4,SL_Keys,0),0)'
+    put('K8', '=IFERROR(MATCH(K4,SL_Keys,0),0)')
     # K9: Cochin freight match row
-    ws['K9'] = '=IFERROR(MATCH("Cochin, IN|"&B10,FR_Keys,0),0)'
+    put('K9', '=IFERROR(MATCH("Cochin, IN|"&B10,FR_Keys,0),0)')
     # K10: Tuticorin freight match row
-    ws['K10'] = '=IFERROR(MATCH("Tuticorin, IN|"&B10,FR_Keys,0),0)'
+    put('K10', '=IFERROR(MATCH("Tuticorin, IN|"&B10,FR_Keys,0),0)')
     # K11: Colombo freight match row
-    ws['K11'] = '=IFERROR(MATCH("Colombo, LK|"&B10,FR_Keys,0),0)'
+    put('K11', '=IFERROR(MATCH("Colombo, LK|"&B10,FR_Keys,0),0)')
     # K12: raw gross weight from tonnage (cascade: Cochin -> Tuticorin -> Colombo)
-    ws['K12'] = '=IF(K9>0,INDEX(FR_GrossWT,K9),IF(K10>0,INDEX(FR_GrossWT,K10),IF(K11>0,INDEX(FR_GrossWT,K11),0)))'
+    put('K12', '=IF(K9>0,INDEX(FR_GrossWT,K9),IF(K10>0,INDEX(FR_GrossWT,K10),IF(K11>0,INDEX(FR_GrossWT,K11),0)))')
     # K13: weight confirmed flag (1=client data, 0=default)
-    ws['K13'] = '=IF(K9>0,INDEX(FR_Confirmed,K9),IF(K10>0,INDEX(FR_Confirmed,K10),IF(K11>0,INDEX(FR_Confirmed,K11),0)))'
+    put('K13', '=IF(K9>0,INDEX(FR_Confirmed,K9),IF(K10>0,INDEX(FR_Confirmed,K10),IF(K11>0,INDEX(FR_Confirmed,K11),0)))')
     ws.column_dimensions['K'].hidden = True
 
     # ── Tonnage warning row ───────────────────────────────────────────────
-    ws.merge_cells('A13:I13')
-    ws['A13'] = (
+    ws.merged_cells.add('A13:I13')
+    c = put('A13', (
         '=IF(AND(B10<>"",K13=0),'
         '"WARNING: No confirmed weight data for this destination. '
         'Using default 23 MT. Verify before quoting.","")'
-    )
-    ws['A13'].font = Font(name='Calibri', size=11, bold=True, color='FFFFFF')
+    ))
+    c.font = BANNER_FONT
     # Conditional formatting: orange background when warning is active
     ws.conditional_formatting.add('A13:I13', FormulaRule(
         formula=['AND($B$10<>"",$K$13=0)'],
@@ -604,12 +681,12 @@ def _build_quote_sheet(ws):
 
     # ── Results section ────────────────────────────────────────────────────
     ws.row_dimensions[14].height = 8   # spacer
-    ws.merge_cells('A15:I15')
-    ws['A15'].value = 'RESULTS'
-    ws['A15'].font = SECTION_FONT
-    ws['A15'].fill = SECTION_FILL
-    for c in range(2, 10):
-        ws.cell(row=15, column=c).fill = SECTION_FILL
+    ws.merged_cells.add('A15:I15')
+    c = put('A15', 'RESULTS')
+    c.font = SECTION_FONT
+    c.fill = SECTION_FILL
+    for col in range(2, 10):
+        put(f'{get_column_letter(col)}15').fill = SECTION_FILL
 
     # Column headers
     result_headers = [
@@ -617,20 +694,20 @@ def _build_quote_sheet(ws):
         'Disc. FOB / Unit ($)', 'Freight / Container ($)', 'Units / Container',
         'Freight / Unit ($)', 'Total Cost / Unit ($)', 'Transit Time (Days)',
     ]
-    for c, h in enumerate(result_headers, 1):
-        cell = ws.cell(row=16, column=c, value=h)
+    for col, h in enumerate(result_headers, 1):
+        cell = put(f'{get_column_letter(col)}16', h)
         cell.font = HEADER_FONT
         cell.fill = HEADER_FILL
-        cell.alignment = Alignment(horizontal='center', wrap_text=True)
+        cell.alignment = CENTER_WRAP_ALIGN
         cell.border = THIN_BORDER
     ws.row_dimensions[16].height = 32
 
     # Cochin row (17)
-    _write_result_row(ws, 17, 'Cochin, IN', 'IN', 'K9', is_alt=False)
+    _write_result_row(put, 17, 'Cochin, IN', 'IN', 'K9', is_alt=False)
     # Tuticorin row (18)
-    _write_result_row(ws, 18, 'Tuticorin, IN', 'IN', 'K10', is_alt=True)
+    _write_result_row(put, 18, 'Tuticorin, IN', 'IN', 'K10', is_alt=True)
     # Colombo row (19)
-    _write_result_row(ws, 19, 'Colombo, LK', 'SL', 'K11', is_alt=False)
+    _write_result_row(put, 19, 'Colombo, LK', 'SL', 'K11', is_alt=False)
 
     # Conditional formatting: amber tint on weight-dependent result cells when unconfirmed
     amber_fill = PatternFill(start_color='FFF2CC', end_color='FFF2CC', fill_type='solid')
@@ -642,8 +719,8 @@ def _build_quote_sheet(ws):
 
     # ── Status message ─────────────────────────────────────────────────────
     ws.row_dimensions[20].height = 8
-    ws.merge_cells('A21:I21')
-    ws['A21'] = (
+    ws.merged_cells.add('A21:I21')
+    put('A21', (
         '=IF(NOT(K6),"Please fill in all input fields above.",'
         'IF(AND(K7=0,K8=0),"No results found with the query inputs.",'
         'IF(AND(K7>0,K8>0,K9>0,K10>0,K11>0),"",'
@@ -652,44 +729,44 @@ def _build_quote_sheet(ws):
         'IF(AND(K9=0,K10=0,K11>0),"No freight routes available from India to this destination.",'
         'IF(AND(K9>0,K10>0,K11=0),"No freight route available from Sri Lanka to this destination.",'
         'IF(AND(K9=0,K10=0,K11=0),"No freight routes available to this destination.",""))))))))'
-    )
-    ws['A21'].font = WARNING_FONT
+    )).font = WARNING_FONT
 
     # ── Full descriptions (reference rows) ─────────────────────────────────
     ws.row_dimensions[22].height = 8
-    ws['A23'].value = 'India - Full Description'
-    ws['A23'].font = DETAIL_FONT_B
-    ws.merge_cells('B23:I23')
-    ws['B23'] = '=IF(NOT(K6),"",IF(K7=0,"-",INDEX(IN_Descs,K7)))'
-    ws['B23'].font = DETAIL_FONT
-
-    ws['A24'].value = 'Sri Lanka - Full Description'
-    ws['A24'].font = DETAIL_FONT_B
-    ws.merge_cells('B24:I24')
-    ws['B24'] = '=IF(NOT(K6),"",IF(K8=0,"-",INDEX(SL_Descs,K8)))'
-    ws['B24'].font = DETAIL_FONT
+    put('A23', 'India - Full Description').font = DETAIL_FONT_B
+    ws.merged_cells.add('B23:I23')
+    put('B23', '=IF(NOT(K6),"",IF(K7=0,"-",INDEX(IN_Descs,K7)))').font = DETAIL_FONT
+
+    put('A24', 'Sri Lanka - Full Description').font = DETAIL_FONT_B
+    ws.merged_cells.add('B24:I24')
+    put('B24', '=IF(NOT(K6),"",IF(K8=0,"-",INDEX(SL_Descs,K8)))').font = DETAIL_FONT
 
     # Page setup
     ws.sheet_properties.pageSetUpPr = openpyxl.worksheet.properties.PageSetupProperties(fitToPage=True)
 
+    # ── Stream buffered cells row by row ───────────────────────────────────
+    for r in range(1, max(cells) + 1):
+        row_cells = cells.get(r, {})
+        ws.append([row_cells.get(col) for col in range(1, max(row_cells, default=0) + 1)])
+
 
-def _write_result_row(ws, row, label, prefix, fr, is_alt=False):
+def _write_result_row(put, row, label, prefix, fr, is_alt=False):
     """Write one result row (Cochin/Tuticorin/Colombo) with lookup formulas."""
-    fill = ALT_ROW_FILL if is_alt else PatternFill()
+    fill = ALT_ROW_FILL if is_alt else NO_FILL
     mr = 'K7' if prefix == 'IN' else 'K8'     # product match ref
 
-    def cell(col, value, fmt=None, align='center'):
-        c = ws.cell(row=row, column=col, value=value)
+    def cell(col, value, fmt=None, align=CENTER_ALIGN):
+        c = put(f'{get_column_letter(col)}{row}', value)
         c.font = RESULT_FONT
         c.fill = fill
         c.border = THIN_BORDER
-        c.alignment = Alignment(horizontal=align)
+        c.alignment = align
         if fmt:
             c.number_format = fmt
         return c
 
     # A: Source label
-    c = ws.cell(row=row, column=1, value=label)
+    c = put(f'A{row}', label)
     c.font = LABEL_FONT
     c.fill = fill
     c.border = THIN_BORDER
@@ -722,16 +799,19 @@ def _write_result_row(ws, row, label, prefix, fr, is_alt=False):
 # ── Main ───────────────────────────────────────────────────────────────────
 def main():
     print("Reading Price List...")
-    price_wb = openpyxl.load_workbook(PRICE_FILE)
-    in_products = read_product_sheet(price_wb, 'IN-GB')
-    sl_products = read_product_sheet(price_wb, 'SL-GB')
+    price_rows = load_sheet_rows(PRICE_FILE, {
+        'IN-GB': (DATA_START_ROW, 25),   # A-Y
+        'SL-GB': (DATA_START_ROW, 25),
+    })
+    in_products = read_product_sheet(price_rows['IN-GB'])
+    sl_products = read_product_sheet(price_rows['SL-GB'])
     print(f"  IN-GB: {len(in_products)} products")
     print(f"  SL-GB: {len(sl_products)} products")
 
     # Report duplicate keys
     for label, products in [('IN-GB', in_products), ('SL-GB', sl_products)]:
-        keys = [p['key'] for p in products]
-        dupes = {k for k in keys if keys.count(k) > 1}
+        key_counts = Counter(p.key for p in products)
+        dupes = {k for k, n in key_counts.items() if n > 1}
         if dupes:
             print(f"  Note: {label} has {len(dupes)} duplicate keys (first match used):")
             for d in sorted(dupes)[:10]:
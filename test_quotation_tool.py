@@ -5,39 +5,397 @@ Simulates Excel formula evaluation to verify lookup logic, freight aggregation,
 tonnage integration, and final calculations before testing in Windows Excel.
 """
 
+import argparse
+import bisect
+import functools
 import openpyxl
 import os
+import pickle
+import posixpath
+import re
 import sys
-from collections import defaultdict
+import zipfile
+from collections import Counter, defaultdict, namedtuple
+from itertools import takewhile
+from xml.etree import ElementTree
+from openpyxl.formula.translate import Translator
+from openpyxl.utils import column_index_from_string, coordinate_to_tuple, get_column_letter
+from openpyxl.utils.datetime import from_ISO8601
+from openpyxl.worksheet.formula import ArrayFormula, DataTableFormula
+from openpyxl.xml.constants import ARC_WORKBOOK, ARC_WORKBOOK_RELS, PKG_REL_NS, REL_NS, SHEET_MAIN_NS
 
 # Use the same folder as this script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TOOL_FILE = os.path.join(BASE_DIR, 'Quotation_Tool.xlsx')
+# Data sheet rows from the last run, reused while TOOL_FILE is unchanged
+ROWS_CACHE_FILE = TOOL_FILE + '.rows.pkl'
+# Bump when iter_sheet_values() changes the values it returns
+ROWS_CACHE_VERSION = 3
+
+# Rule under each report heading
+BAR = '=' * 60
+
+# Data sheets read into the Tool: (sheet name, columns to read)
+DATA_SHEETS = [('IN_GB', 24), ('SL_GB', 24), ('Freight', 8)]
+
+# Dropdown lists in columns A:H of the Lists sheet, in column order
+LIST_NAMES = ['Size', 'Chips_Pith', 'EC_Level', 'Plastic', 'Holes', 'BSU', 'Destination', 'Weight_MT']
+
+# Everything the tests read, as plain data (the workbook is closed once it is
+# read): sheet name -> state in workbook order, the header and rows of each
+# data sheet, a key -> row index per data sheet, the tier columns per product
+# sheet, the Freight aggregates, the Lists rows below the header, the defined
+# names (name -> reference text) and a snapshot of the Quote sheet
+Tool = namedtuple('Tool', 'sheet_states headers in_data sl_data fr_data in_index sl_index fr_index '
+                          'in_tiers sl_tiers freight lists names quote')
+
+# Quote sheet snapshot: {(row, col): value} for non-empty cells, the formula1
+# of each data validation, the conditional formatting ranges and the letters
+# of hidden columns
+Quote = namedtuple('Quote', 'cells validations cf_ranges hidden_cols')
+
+# Aggregates over the Freight rows used by Tests 3, 8 and 9 (see freight_stats)
+FreightStats = namedtuple('FreightStats', 'origin_counts dests_by_origin confirmed default has_weight '
+                                          'bad_defaults bad_flags negative dest_weights inconsistent unmappable')
+
+# PCS (K:Q) and FOB (R:X) columns of a product sheet, one tuple per weight tier
+Tiers = namedtuple('Tiers', 'pcs fob')
+
+# Weight tiers (MT) of the PCS/FOB columns, ascending
+WEIGHT_TIERS = [19.5, 22, 23, 24, 25, 26, 27]
+
+# 3 origins: Cochin and Tuticorin use IN products, Colombo uses SL products
+ORIGINS = [('Cochin, IN', 'IN'), ('Tuticorin, IN', 'IN'), ('Colombo, LK', 'SL')]
+# Freight key prefix per origin (keys are origin|destination)
+FR_KEY_PREFIXES = {origin: origin + '|' for origin, _ in ORIGINS}
+
+# simulate() result for an origin with no product match (shared, read-only)
+NO_MATCH_RESULT = dict.fromkeys([
+    'product_code', 'description', 'fob', 'disc_fob', 'freight_container',
+    'units_container', 'freight_per_unit', 'total_cost', 'transit_days',
+    'gross_wt', 'confirmed', 'tier',
+])
+
+# Formula scans for Test 7
+FUNC_RE = re.compile(r'([A-Z]+)\(')
+MAC_ONLY_FUNCS = ['WEBSERVICE', 'FILTERXML']
+COMPAT_RE = re.compile(r';|' + '|'.join(MAC_ONLY_FUNCS), re.IGNORECASE)
+MAC_PATH_RE = re.compile(r'Macintosh|/Users/')
+
+# The xlsx package read directly (without openpyxl): the open zip, sheet
+# name -> worksheet part path, and the shared string table
+Package = namedtuple('Package', 'zip sheets shared_strings')
+
+# Package XML tags and relationship types read by open_package()
+SHEET_TAG = f'{{{SHEET_MAIN_NS}}}sheet'
+STRING_ITEM_TAG = f'{{{SHEET_MAIN_NS}}}si'
+RELATIONSHIP_TAG = f'{{{PKG_REL_NS}}}Relationship'
+REL_ID_ATTR = f'{{{REL_NS}}}id'
+SHARED_STRINGS_REL = REL_NS + '/sharedStrings'
+
+# Sheet XML tags read by iter_sheet_values()
+ROW_TAG = f'{{{SHEET_MAIN_NS}}}row'
+CELL_TAG = f'{{{SHEET_MAIN_NS}}}c'
+VALUE_TAG = f'{{{SHEET_MAIN_NS}}}v'
+FORMULA_TAG = f'{{{SHEET_MAIN_NS}}}f'
+INLINE_STRING_TAG = f'{{{SHEET_MAIN_NS}}}is'
+RUN_TAG = f'{{{SHEET_MAIN_NS}}}r'
+TEXT_TAG = f'{{{SHEET_MAIN_NS}}}t'
+COLUMN_RE = re.compile(r'[A-Z]+')
 
 def load_tool():
-    """Load the generated tool and extract all data sheets."""
-    wb = openpyxl.load_workbook(TOOL_FILE, data_only=False)
-    return wb
-
-def get_sheet_data(ws, max_col=None):
-    """Read all rows from a sheet into a list of lists."""
-    rows = []
-    for row in ws.iter_rows(min_row=2, max_col=max_col, values_only=True):
-        rows.append(list(row))
-    return rows
-
-def test_structure(wb):
+    """Load the generated tool and extract all data sheets.
+
+    The result is reused until TOOL_FILE's modification time (in
+    nanoseconds) or size changes, so rebuilding the tool mid-process is
+    picked up by the next call.
+    """
+    st = os.stat(TOOL_FILE)
+    return _load_tool((st.st_mtime_ns, st.st_size))
+
+@functools.lru_cache(maxsize=1)
+def _load_tool(stamp):
+    """Build the Tool for the TOOL_FILE with stamp (mtime_ns, size).
+
+    The read-only workbook serves the sheet list, sheet states, defined names
+    and Quote cells; the data sheet rows and the Quote details it does not
+    expose are read from the package XML (see open_package()).
+    """
+    wb = openpyxl.load_workbook(TOOL_FILE, read_only=True, data_only=False, keep_links=False)
+    try:
+        with zipfile.ZipFile(TOOL_FILE) as archive:
+            package = open_package(archive)
+            sheets = load_sheet_rows(package, stamp)
+            quote = read_quote(wb, package)
+        sheet_states = {ws.title: ws.sheet_state for ws in wb.worksheets}
+        lists = tuple(wb['Lists'].iter_rows(min_row=2, max_col=len(LIST_NAMES), values_only=True))
+        names = {name: dn.attr_text for name, dn in wb.defined_names.items()}
+    finally:
+        # A read-only workbook keeps the file open; on Windows that would
+        # block rebuilding the tool while this process is alive
+        wb.close()
+    headers = {name: header for name, (header, _) in sheets.items()}
+    in_data = sheets['IN_GB'][1]
+    sl_data = sheets['SL_GB'][1]
+    fr_data = sheets['Freight'][1]
+
+    return Tool(
+        sheet_states=sheet_states,
+        headers=headers,
+        in_data=in_data,
+        sl_data=sl_data,
+        fr_data=fr_data,
+        in_index=key_index(in_data),
+        sl_index=key_index(sl_data),
+        fr_index=key_index(fr_data),
+        in_tiers=tier_columns(in_data),
+        sl_tiers=tier_columns(sl_data),
+        freight=freight_stats(fr_data),
+        lists=lists,
+        names=names,
+        quote=quote,
+    )
+
+def load_sheet_rows(package, stamp):
+    """Return {sheet: (header, rows)} for DATA_SHEETS, cached on disk.
+
+    The cache is keyed on ROWS_CACHE_VERSION, DATA_SHEETS, TOOL_FILE's
+    (mtime_ns, size) stamp and the CRC-32 of each data sheet part (from the
+    zip directory, so a rebuild within one coarse mtime tick still changes
+    the key), so rebuilding the tool or changing how the sheets are read
+    invalidates it. Any cache that fails to load, has another key or
+    does not hold rows of the DATA_SHEETS shape is rebuilt from the workbook.
+    """
+    crcs = tuple(package.zip.getinfo(package.sheets[name]).CRC for name, _ in DATA_SHEETS)
+    key = (ROWS_CACHE_VERSION, DATA_SHEETS, stamp, crcs)
+    try:
+        with open(ROWS_CACHE_FILE, 'rb') as f:
+            cached = pickle.load(f)
+        if isinstance(cached, dict) and cached.get('key') == key and sheet_rows_valid(cached.get('sheets')):
+            return cached['sheets']
+    except Exception:   # e.g. truncated, newer protocol, missing classes
+        pass
+
+    sheets = {name: get_sheet_data(package, name, max_col) for name, max_col in DATA_SHEETS}
+    try:
+        with open(ROWS_CACHE_FILE, 'wb') as f:
+            pickle.dump({'key': key, 'sheets': sheets}, f, pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return sheets
+
+def sheet_rows_valid(sheets):
+    """Whether sheets is {sheet: (header, rows)} with max_col-wide row tuples for DATA_SHEETS."""
+    if not isinstance(sheets, dict) or sheets.keys() != {name for name, _ in DATA_SHEETS}:
+        return False
+    for name, max_col in DATA_SHEETS:
+        entry = sheets[name]
+        if not (isinstance(entry, tuple) and len(entry) == 2 and isinstance(entry[1], tuple)):
+            return False
+        header, rows = entry
+        if not all(isinstance(row, tuple) and len(row) == max_col for row in (header, *rows)):
+            return False
+    return True
+
+def open_package(archive):
+    """Resolve the worksheet parts and shared strings of an open xlsx zip.
+
+    Sheet names map to parts through xl/workbook.xml and its relationships,
+    as Excel resolves them; the shared string table is optional.
+    """
+    rels = {rel.get('Id'): rel
+            for rel in ElementTree.fromstring(archive.read(ARC_WORKBOOK_RELS)).iter(RELATIONSHIP_TAG)}
+    workbook = ElementTree.fromstring(archive.read(ARC_WORKBOOK))
+    sheets = {sheet.get('name'): part_path(rels[sheet.get(REL_ID_ATTR)].get('Target'))
+              for sheet in workbook.iter(SHEET_TAG)}
+
+    shared_strings = []
+    for rel in rels.values():
+        if rel.get('Type') == SHARED_STRINGS_REL:
+            root = ElementTree.fromstring(archive.read(part_path(rel.get('Target'))))
+            shared_strings = [string_item_text(si) for si in root.iter(STRING_ITEM_TAG)]
+    return Package(archive, sheets, shared_strings)
+
+def part_path(target):
+    """Zip member name of a workbook relationship target (relative to xl/)."""
+    if target.startswith('/'):
+        return target[1:]
+    return posixpath.normpath(posixpath.join('xl', target))
+
+def string_item_text(item):
+    """Text of a shared (<si>) or inline (<is>) string, plain or rich text.
+
+    Rich text is the concatenation of its runs; phonetic hints are skipped.
+    """
+    text = item.findtext(TEXT_TAG)
+    if text is None:
+        text = ''.join(run.findtext(TEXT_TAG) or '' for run in item.iter(RUN_TAG))
+    return text
+
+def read_quote(wb, package):
+    """Snapshot the Quote sheet.
+
+    Read-only worksheets skip data validations, conditional formatting and
+    column dimensions, so those are taken from the sheet XML directly.
+    """
+    ws = wb['Quote']
+    cells = {(r, c): v
+             for r, row in enumerate(ws.iter_rows(values_only=True), 1)
+             for c, v in enumerate(row, 1) if v is not None}
+
+    root = ElementTree.fromstring(package.zip.read(package.sheets['Quote']))
+    ns = f'{{{SHEET_MAIN_NS}}}'
+    validations = [dv.findtext(f'{ns}formula1') for dv in root.iter(f'{ns}dataValidation')]
+    # One entry per range, as openpyxl groups rules by sqref
+    cf_ranges = list(dict.fromkeys(cf.get('sqref') for cf in root.iter(f'{ns}conditionalFormatting')))
+    hidden_cols = {get_column_letter(c)
+                   for col in root.iter(f'{ns}col') if col.get('hidden') in ('1', 'true')
+                   for c in range(int(col.get('min')), int(col.get('max')) + 1)}
+    return Quote(cells, validations, cf_ranges, hidden_cols)
+
+def key_index(rows):
+    """Map each key (column A) to its first row index, as an exact MATCH does."""
+    index = {}
+    for i, row in enumerate(rows):
+        index.setdefault(row[0], i)
+    return index
+
+def freight_stats(fr_data):
+    """Compute every Freight aggregate the tests check in one pass over the rows."""
+    origin_counts = defaultdict(int)
+    dests_by_origin = defaultdict(set)
+    confirmed = default = has_weight = bad_defaults = bad_flags = 0
+    negative = []       # (key, all_in) for negative ALL IN freight
+    dest_weights = {}   # destination -> (gross, confirmed) of its first row
+    inconsistent = []   # (destination, first gross, differing gross)
+    unmappable = []     # (destination, gross) below every weight tier
+    for key, _country, origin, dest, _transit, all_in, gross, flag in fr_data:
+        origin_counts[origin] += 1
+        dests_by_origin[origin].add(dest)
+        if flag == 1:
+            confirmed += 1
+        elif flag == 0:
+            default += 1
+            if gross != 23:
+                bad_defaults += 1
+        else:
+            bad_flags += 1
+        if gross is not None and gross > 0:
+            has_weight += 1
+        if all_in is not None and all_in < 0:
+            negative.append((key, all_in))
+        first = dest_weights.setdefault(dest, (gross, flag))
+        if first[0] != gross:
+            inconsistent.append((dest, first[0], gross))
+        # Lighter than the lightest tier; a blank weight is reported by Test 3
+        if gross is not None and gross < WEIGHT_TIERS[0]:
+            unmappable.append((dest, gross))
+    return FreightStats(dict(origin_counts), dict(dests_by_origin), confirmed, default, has_weight,
+                        bad_defaults, bad_flags, negative, dest_weights, inconsistent, unmappable)
+
+def tier_columns(rows):
+    """Transpose the 7-tier PCS and FOB blocks of product rows into columns."""
+    cols = tuple(zip(*rows)) or ((),) * 24
+    return Tiers(pcs=cols[10:17], fob=cols[17:24])
+
+def get_sheet_data(package, name, max_col):
+    """Read a sheet in one pass as (header row, tuple of data row tuples)."""
+    rows = iter_sheet_values(package, name, max_col)
+    header = next(rows, (None,) * max_col)
+    return header, tuple(rows)
+
+def iter_sheet_values(package, name, max_col):
+    """Yield each row of a worksheet as a tuple of max_col values.
+
+    Streams the sheet XML with ElementTree.iterparse, which is about twice as
+    fast as openpyxl's cell reader for the data sheets. Values match a
+    data_only=False openpyxl load (see cell_value()), except that number
+    formats are not applied, so date-formatted numbers stay numbers. Inline
+    strings are interned.
+    """
+    shared = package.shared_strings
+    shared_formulae = {}    # shared formula index -> Translator of its master
+    expected = 1
+    with package.zip.open(package.sheets[name]) as src:
+        for _, el in ElementTree.iterparse(src):
+            if el.tag != ROW_TAG:
+                continue
+            r = int(el.get('r', expected))
+            while expected < r:                 # rows with no cells at all
+                yield (None,) * max_col
+                expected += 1
+            row = [None] * max_col
+            col = 0
+            for c in el.iter(CELL_TAG):
+                ref = c.get('r')
+                # A cell without a reference follows the previous cell
+                col = column_index_from_string(COLUMN_RE.match(ref).group()) if ref else col + 1
+                if col > max_col:
+                    continue
+                row[col - 1] = cell_value(c, shared, shared_formulae, ref or f"{get_column_letter(col)}{r}")
+            el.clear()
+            yield tuple(row)
+            expected = r + 1
+
+def cell_value(c, shared, shared_formulae, coordinate):
+    """Value of one <c> element, as openpyxl's reader returns it.
+
+    Formulas come back as '=...' text (shared formulas translated to the cell,
+    array and data table formulas as openpyxl's objects), error cells as their
+    error text (e.g. '#N/A') and ISO dates as datetimes; unknown cell types
+    keep their raw text, as in openpyxl.
+    """
+    t = c.get('t', 'n')
+    formula = c.find(FORMULA_TAG)
+    if formula is not None:
+        return formula_value(formula, shared_formulae, coordinate)
+    if t == 'inlineStr':
+        # Interned: origins, countries and destinations repeat on every route
+        inline = c.find(INLINE_STRING_TAG)
+        if inline is None:
+            return None
+        return sys.intern(string_item_text(inline)) or None
+    value = c.findtext(VALUE_TAG) or None
+    if value is None:
+        return None
+    if t == 'n':
+        return float(value) if '.' in value or 'E' in value or 'e' in value else int(value)
+    if t == 's':
+        return shared[int(value)]
+    if t == 'b':
+        return bool(int(value))
+    if t == 'd':
+        return from_ISO8601(value)
+    return value        # 'str', 'e' and unknown types
+
+def formula_value(formula, shared_formulae, coordinate):
+    """Value of a cell's <f> element, as openpyxl's reader returns it."""
+    kind = formula.get('t')
+    value = '=' + (formula.text or '')
+    if kind == 'array':
+        return ArrayFormula(ref=formula.get('ref'), text=value)
+    if kind == 'dataTable':
+        return DataTableFormula(**formula.attrib)
+    if kind == 'shared':
+        index = formula.get('si')
+        if index in shared_formulae:
+            return shared_formulae[index].translate_formula(coordinate)
+        if value != '=':
+            shared_formulae[index] = Translator(value, coordinate)
+    return value
+
+def test_structure(tool):
     """Test 1: Verify workbook structure."""
-    print("=" * 60)
-    print("TEST 1: Workbook Structure")
-    print("=" * 60)
+    print(f"{BAR}\nTEST 1: Workbook Structure\n{BAR}")
 
     expected_sheets = ['Quote', 'Lists', 'IN_GB', 'SL_GB', 'Freight']
-    actual_sheets = wb.sheetnames
+    # Sheet name -> state, in workbook order
+    sheet_states = tool.sheet_states
+    actual_sheets = list(sheet_states)
 
     ok = True
     for s in expected_sheets:
-        if s in actual_sheets:
+        if s in sheet_states:
             print(f"  [PASS] Sheet '{s}' exists")
         else:
             print(f"  [FAIL] Sheet '{s}' MISSING")
@@ -47,23 +405,22 @@ def test_structure(wb):
     if actual_sheets[0] == 'Quote':
         print(f"  [PASS] 'Quote' is the first sheet")
     else:
-        print(f"  [FAIL] 'Quote' is not first — it's at position {actual_sheets.index('Quote') if 'Quote' in actual_sheets else 'N/A'}")
+        print(f"  [FAIL] 'Quote' is not first — it's at position {actual_sheets.index('Quote') if 'Quote' in sheet_states else 'N/A'}")
         ok = False
 
     # Check hidden sheets
     for s in ['Lists', 'IN_GB', 'SL_GB', 'Freight']:
-        if s in actual_sheets and wb[s].sheet_state == 'hidden':
+        state = sheet_states.get(s)
+        if state == 'hidden':
             print(f"  [PASS] Sheet '{s}' is hidden")
-        elif s in actual_sheets:
+        elif state is not None:
             print(f"  [WARN] Sheet '{s}' is NOT hidden")
 
     return ok
 
-def test_named_ranges(wb):
+def test_named_ranges(tool):
     """Test 2: Verify named ranges exist and are non-empty."""
-    print("\n" + "=" * 60)
-    print("TEST 2: Named Ranges")
-    print("=" * 60)
+    print(f"\n{BAR}\nTEST 2: Named Ranges\n{BAR}")
 
     expected = [
         'IN_Keys', 'IN_ProdNos', 'IN_Descs', 'IN_PCS', 'IN_FOB',
@@ -74,73 +431,71 @@ def test_named_ranges(wb):
         'HolesList', 'BSUList', 'DestList', 'WeightTiers',
     ]
 
+    names = tool.names
     ok = True
     for name in expected:
-        dn = wb.defined_names.get(name)
-        if dn:
-            print(f"  [PASS] '{name}' -> {dn.attr_text}")
+        if name in names:
+            print(f"  [PASS] '{name}' -> {names[name]}")
         else:
             print(f"  [FAIL] '{name}' NOT FOUND")
             ok = False
 
-    print(f"  [INFO] Total named ranges: {len(expected)} expected, {len(list(wb.defined_names))} found")
+    print(f"  [INFO] Total named ranges: {len(expected)} expected, {len(names)} found")
     return ok
 
-def test_data_integrity(wb):
+def test_data_integrity(tool):
     """Test 3: Verify data sheet contents and consistency."""
-    print("\n" + "=" * 60)
-    print("TEST 3: Data Integrity")
-    print("=" * 60)
+    print(f"\n{BAR}\nTEST 3: Data Integrity\n{BAR}")
 
     ok = True
 
     # IN_GB
-    ws_in = wb['IN_GB']
-    in_rows = get_sheet_data(ws_in, max_col=24)
+    in_rows = tool.in_data
     print(f"  IN_GB: {len(in_rows)} products")
 
     # Check header row
-    headers_in = [ws_in.cell(row=1, column=c).value for c in range(1, 25)]
+    headers_in = tool.headers['IN_GB']
     if headers_in[0] == 'Key':
         print(f"  [PASS] IN_GB headers start with 'Key'")
     else:
         print(f"  [FAIL] IN_GB header[0] = '{headers_in[0]}', expected 'Key'")
         ok = False
 
-    # Verify keys are non-empty
-    empty_keys = sum(1 for r in in_rows if not r[0])
+    # Verify keys are non-empty, and count products with any FOB price, in
+    # one pass over the rows
+    empty_keys = products_with_fob = 0
+    for r in in_rows:
+        if not r[0]:
+            empty_keys += 1
+        if any(r[17:24]):
+            products_with_fob += 1
     if empty_keys == 0:
         print(f"  [PASS] All IN_GB rows have keys")
     else:
         print(f"  [WARN] {empty_keys} IN_GB rows have empty keys")
 
     # Check a few products have FOB prices
-    products_with_fob = sum(1 for r in in_rows if any(r[17+i] for i in range(7)))
     print(f"  [INFO] {products_with_fob}/{len(in_rows)} IN_GB products have at least one FOB price")
 
     # SL_GB
-    ws_sl = wb['SL_GB']
-    sl_rows = get_sheet_data(ws_sl, max_col=24)
+    sl_rows = tool.sl_data
     print(f"  SL_GB: {len(sl_rows)} products")
 
-    products_with_fob = sum(1 for r in sl_rows if any(r[17+i] for i in range(7)))
+    products_with_fob = sum(1 for r in sl_rows if any(r[17:24]))
     print(f"  [INFO] {products_with_fob}/{len(sl_rows)} SL_GB products have at least one FOB price")
 
     # Freight (8 columns: A-H)
-    ws_fr = wb['Freight']
-    fr_rows = get_sheet_data(ws_fr, max_col=8)
+    fr_rows = tool.fr_data
     print(f"  Freight: {len(fr_rows)} routes")
 
+    freight = tool.freight
+
     # Count routes per origin
-    origin_counts = {}
-    for r in fr_rows:
-        origin = r[2]
-        origin_counts[origin] = origin_counts.get(origin, 0) + 1
-    for origin, count in sorted(origin_counts.items()):
+    for origin, count in sorted(freight.origin_counts.items()):
         print(f"  [INFO] {origin}: {count} routes")
 
     # Check column headers
-    fr_headers = [ws_fr.cell(row=1, column=c).value for c in range(1, 9)]
+    fr_headers = tool.headers['Freight']
     if fr_headers[5] == 'All_In_USD' and fr_headers[6] == 'Gross_Weight_MT' and fr_headers[7] == 'Weight_Confirmed':
         print(f"  [PASS] Freight columns F-H present (All_In_USD, Gross_Weight_MT, Weight_Confirmed)")
     else:
@@ -148,108 +503,78 @@ def test_data_integrity(wb):
         ok = False
 
     # Validate tonnage data
-    confirmed_count = sum(1 for r in fr_rows if r[7] == 1)
-    default_count = sum(1 for r in fr_rows if r[7] == 0)
-    has_weight = sum(1 for r in fr_rows if r[6] is not None and r[6] > 0)
-    print(f"  [INFO] Tonnage: {confirmed_count} confirmed, {default_count} default (out of {len(fr_rows)} routes)")
+    print(f"  [INFO] Tonnage: {freight.confirmed} confirmed, {freight.default} default (out of {len(fr_rows)} routes)")
 
-    if has_weight == len(fr_rows):
+    if freight.has_weight == len(fr_rows):
         print(f"  [PASS] All freight routes have a weight value")
     else:
-        print(f"  [FAIL] {len(fr_rows) - has_weight} routes missing weight data")
+        print(f"  [FAIL] {len(fr_rows) - freight.has_weight} routes missing weight data")
         ok = False
 
     # Confirm all default weights are 23
-    bad_defaults = [r for r in fr_rows if r[7] == 0 and r[6] != 23]
-    if not bad_defaults:
+    if not freight.bad_defaults:
         print(f"  [PASS] All unconfirmed routes use default 23 MT")
     else:
-        print(f"  [FAIL] {len(bad_defaults)} unconfirmed routes with non-23 weight")
+        print(f"  [FAIL] {freight.bad_defaults} unconfirmed routes with non-23 weight")
         ok = False
 
     # Confirm flag is 0 or 1
-    bad_flags = [r for r in fr_rows if r[7] not in (0, 1)]
-    if not bad_flags:
+    if not freight.bad_flags:
         print(f"  [PASS] All Weight_Confirmed flags are 0 or 1")
     else:
-        print(f"  [FAIL] {len(bad_flags)} routes with invalid confirmed flag")
+        print(f"  [FAIL] {freight.bad_flags} routes with invalid confirmed flag")
         ok = False
 
     # Lists
-    ws_lists = wb['Lists']
     list_counts = {}
-    for col_idx, name in enumerate(['Size', 'Chips_Pith', 'EC_Level', 'Plastic', 'Holes', 'BSU', 'Destination', 'Weight_MT'], 1):
-        count = 0
-        r = 2
-        while ws_lists.cell(row=r, column=col_idx).value is not None:
-            count += 1
-            r += 1
-        list_counts[name] = count
+    # Count each column from row 2 down to its first blank cell
+    for name, col in zip(LIST_NAMES, zip(*tool.lists)):
+        list_counts[name] = sum(1 for _ in takewhile(lambda v: v is not None, col))
     print(f"  [INFO] Dropdown lists: {list_counts}")
 
     return ok
 
-def test_formula_simulation(wb):
+def test_formula_simulation(tool):
     """Test 4: Simulate formula evaluation for specific input combinations."""
-    print("\n" + "=" * 60)
-    print("TEST 4: Formula Simulation (Core Logic)")
-    print("=" * 60)
-
-    # Load data into memory
-    ws_in = wb['IN_GB']
-    ws_sl = wb['SL_GB']
-    ws_fr = wb['Freight']
-
-    in_data = get_sheet_data(ws_in, max_col=24)
-    sl_data = get_sheet_data(ws_sl, max_col=24)
-    fr_data = get_sheet_data(ws_fr, max_col=8)
-
-    weight_tiers = [19.5, 22, 23, 24, 25, 26, 27]
-
-    # 3 origins: Cochin and Tuticorin use IN products, Colombo uses SL products
-    ORIGINS = [
-        ('Cochin, IN', in_data, 'IN'),
-        ('Tuticorin, IN', in_data, 'IN'),
-        ('Colombo, LK', sl_data, 'SL'),
-    ]
+    print(f"\n{BAR}\nTEST 4: Formula Simulation (Core Logic)\n{BAR}")
+
+    in_data, sl_data, fr_data = tool.in_data, tool.sl_data, tool.fr_data
+    fr_index = tool.fr_index
+    products = {'IN': (in_data, tool.in_index), 'SL': (sl_data, tool.sl_index)}
 
     def simulate(size, chips, ec, plastic, holes, bsu, destination):
         """Simulate what Excel formulas would compute (weight auto-derived from tonnage)."""
-        lookup_key = f"{size}|{chips}|{ec}|{plastic}|{holes}|{bsu}"
+        lookup_key = sys.intern("|".join((size, chips, ec, plastic, holes, bsu)))
 
         results = {}
-        for origin, data, prefix in ORIGINS:
-            # MATCH product
-            prod_match = None
-            for i, row in enumerate(data):
-                if row[0] == lookup_key:
-                    prod_match = i
-                    break
+        for origin, prefix in ORIGINS:
+            data, index = products[prefix]
+            # MATCH product; the report skips an origin without one, so
+            # there is no need to simulate its freight columns
+            prod_match = index.get(lookup_key)
+            if prod_match is None:
+                results[origin] = NO_MATCH_RESULT
+                continue
 
             # MATCH freight (key is origin|destination)
-            fr_key = f"{origin}|{destination}"
-            fr_match = None
-            for i, row in enumerate(fr_data):
-                if row[0] == fr_key:
-                    fr_match = i
-                    break
-
-            # Get weight tier from freight data (col G=index 6)
-            gross_wt = None
-            confirmed = None
+            fr_key = sys.intern(FR_KEY_PREFIXES[origin] + destination)
+            fr_match = fr_index.get(fr_key)
+
+            # Transit (E), All_In_USD (F), gross weight (G) and confirmed flag (H)
             if fr_match is not None:
-                gross_wt = fr_data[fr_match][6]
-                confirmed = fr_data[fr_match][7]
+                transit, all_in_usd, gross_wt, confirmed = fr_data[fr_match][4:8]
+                freight_total = all_in_usd * 1.0605
+            else:
+                transit = freight_total = gross_wt = confirmed = None
 
             # Approximate MATCH for weight tier (largest tier <= gross weight)
             wt_idx = None
             if gross_wt is not None:
-                for i in range(len(weight_tiers) - 1, -1, -1):
-                    if weight_tiers[i] <= gross_wt:
-                        wt_idx = i
-                        break
+                i = bisect.bisect_right(WEIGHT_TIERS, gross_wt) - 1
+                if i >= 0:
+                    wt_idx = i
 
-            if prod_match is not None and wt_idx is not None:
+            if wt_idx is not None:
                 prod_code = data[prod_match][1]
                 desc = data[prod_match][2]
                 pcs = data[prod_match][10 + wt_idx]
@@ -260,14 +585,6 @@ def test_formula_simulation(wb):
                 pcs = None
                 fob = None
 
-            if fr_match is not None:
-                transit = fr_data[fr_match][4]
-                all_in_usd = fr_data[fr_match][5]  # All_In_USD column F
-                freight_total = all_in_usd * 1.0605
-            else:
-                transit = None
-                freight_total = None
-
             discount = 0.30  # default 30%
             disc_fob = None
             freight_per_unit = None
@@ -291,7 +608,7 @@ def test_formula_simulation(wb):
                 'transit_days': transit,
                 'gross_wt': gross_wt,
                 'confirmed': confirmed,
-                'tier': weight_tiers[wt_idx] if wt_idx is not None else None,
+                'tier': WEIGHT_TIERS[wt_idx] if wt_idx is not None else None,
             }
 
         return lookup_key, results
@@ -301,9 +618,7 @@ def test_formula_simulation(wb):
     # ── Test Case 1: Find a product that exists in BOTH India and Sri Lanka ──
     print("\n  --- Test 4a: Finding a product in both origins ---")
 
-    in_keys = set(r[0] for r in in_data)
-    sl_keys = set(r[0] for r in sl_data)
-    common_keys = in_keys & sl_keys
+    common_keys = tool.in_index.keys() & tool.sl_index.keys()
     print(f"  [INFO] {len(common_keys)} product keys exist in BOTH India and Sri Lanka")
 
     if common_keys:
@@ -311,7 +626,7 @@ def test_formula_simulation(wb):
         parts = test_key.split('|')
         if len(parts) == 6:
             # Find destinations available across all 3 origins
-            all_dests = set(r[3] for r in fr_data)
+            all_dests = set().union(*tool.freight.dests_by_origin.values())
             if all_dests:
                 test_dest = sorted(all_dests)[0]
 
@@ -369,17 +684,15 @@ def test_formula_simulation(wb):
     print("  Reference: India FOB=2, Freight=3000, Units=8000, Total=2.375")
     print("  Reference: Sri Lanka FOB=2, Freight=5000, Units=7000, Total=2.714")
 
-    in_fob2 = []
-    for r in in_data:
-        for i in range(7):
-            if r[17 + i] == 2 or r[17 + i] == 2.0:
-                in_fob2.append((r[0], r[1], r[2], weight_tiers[i], r[10 + i]))
+    def fob_hits(data, price):
+        """(key, code, desc, tier, pcs) for every tier whose FOB equals price."""
+        return [(r[0], r[1], r[2], wt, pcs)
+                for r in data
+                for wt, fob, pcs in zip(WEIGHT_TIERS, r[17:24], r[10:17])
+                if fob == price]
 
-    sl_fob2 = []
-    for r in sl_data:
-        for i in range(7):
-            if r[17 + i] == 2 or r[17 + i] == 2.0:
-                sl_fob2.append((r[0], r[1], r[2], weight_tiers[i], r[10 + i]))
+    in_fob2 = fob_hits(in_data, 2)
+    sl_fob2 = fob_hits(sl_data, 2)
 
     print(f"  [INFO] India products with FOB=$2: {len(in_fob2)}")
     print(f"  [INFO] Sri Lanka products with FOB=$2: {len(sl_fob2)}")
@@ -412,9 +725,16 @@ def test_formula_simulation(wb):
         else:
             print(f"  [INFO] No shared keys between India/SL matching reference (may use different weight tiers)")
 
-    # Search for freight routes with ALL IN ~3000 and ~5000
-    routes_3000 = [(r[2], r[3], r[5]) for r in fr_data if r[5] is not None and 2800 <= r[5] <= 3200]
-    routes_5000 = [(r[2], r[3], r[5]) for r in fr_data if r[5] is not None and 4800 <= r[5] <= 5200]
+    # Search for freight routes with ALL IN ~3000 and ~5000 (one pass)
+    routes_3000 = []
+    routes_5000 = []
+    for _key, _country, origin, dest, _transit, all_in, _gross, _flag in fr_data:
+        if all_in is None:
+            continue
+        if 2800 <= all_in <= 3200:
+            routes_3000.append((origin, dest, all_in))
+        elif 4800 <= all_in <= 5200:
+            routes_5000.append((origin, dest, all_in))
 
     if routes_3000:
         print(f"  [INFO] Routes with ALL IN ~$3000: {len(routes_3000)}")
@@ -428,17 +748,19 @@ def test_formula_simulation(wb):
 
     return ok
 
-def test_quote_formulas(wb):
+def test_quote_formulas(tool):
     """Test 5: Verify the Quote sheet formulas are present and correctly structured."""
-    print("\n" + "=" * 60)
-    print("TEST 5: Quote Sheet Formula Verification")
-    print("=" * 60)
+    print(f"\n{BAR}\nTEST 5: Quote Sheet Formula Verification\n{BAR}")
+
+    cells = tool.quote.cells
+
+    def value(ref):
+        return cells.get(coordinate_to_tuple(ref))
 
-    ws = wb['Quote']
     ok = True
 
     # Check title
-    title = ws['A1'].value
+    title = value('A1')
     if 'QUOTATION TOOL' in str(title):
         print(f"  [PASS] Title present: {title}")
     else:
@@ -452,7 +774,7 @@ def test_quote_formulas(wb):
         12: 'Discount',
     }
     for row, expected in input_labels.items():
-        label = ws.cell(row=row, column=1).value
+        label = cells.get((row, 1))
         if label and expected.lower() in label.lower():
             print(f"  [PASS] Row {row}: '{label}'")
         else:
@@ -460,7 +782,7 @@ def test_quote_formulas(wb):
             ok = False
 
     # B11 should be a formula (auto-derived, not a dropdown)
-    b11 = ws['B11'].value
+    b11 = value('B11')
     if b11 and str(b11).startswith('=') and 'WeightTiers' in str(b11):
         print(f"  [PASS] B11 is an auto-derived formula (not a dropdown)")
     else:
@@ -468,7 +790,7 @@ def test_quote_formulas(wb):
         ok = False
 
     # B12 should be the discount input (default 30%)
-    b12 = ws['B12'].value
+    b12 = value('B12')
     if b12 == 0.3 or b12 == 0.30:
         print(f"  [PASS] B12 discount default = {b12} (30%)")
     else:
@@ -489,7 +811,7 @@ def test_quote_formulas(wb):
         'K13': 'INDEX(FR_Confirmed',                           # confirmed flag
     }
     for cell_ref, expected_fragment in helper_cells.items():
-        formula = ws[cell_ref].value
+        formula = value(cell_ref)
         if formula and expected_fragment in str(formula):
             print(f"  [PASS] {cell_ref} contains correct formula")
         else:
@@ -498,7 +820,7 @@ def test_quote_formulas(wb):
 
     # Check result rows (3 origins)
     for row, label in [(17, 'Cochin, IN'), (18, 'Tuticorin, IN'), (19, 'Colombo, LK')]:
-        src = ws.cell(row=row, column=1).value
+        src = cells.get((row, 1))
         if src == label:
             print(f"  [PASS] Row {row} source label: {label}")
         else:
@@ -507,7 +829,7 @@ def test_quote_formulas(wb):
 
         # Check each result column has a formula (B through I = 9 columns)
         for col in range(2, 10):
-            val = ws.cell(row=row, column=col).value
+            val = cells.get((row, col))
             if val and str(val).startswith('='):
                 pass  # formula present
             else:
@@ -518,7 +840,7 @@ def test_quote_formulas(wb):
         print(f"  [PASS] All result formulas present in rows 17-19")
 
     # Check warning message formula
-    warn = ws['A21'].value
+    warn = value('A21')
     if warn and 'K6' in str(warn) and 'K7' in str(warn):
         print(f"  [PASS] Status message formula present")
     else:
@@ -526,7 +848,7 @@ def test_quote_formulas(wb):
         ok = False
 
     # Check tonnage warning row (A13)
-    tonnage_warn = ws['A13'].value
+    tonnage_warn = value('A13')
     if tonnage_warn and 'K13' in str(tonnage_warn) and 'WARNING' in str(tonnage_warn):
         print(f"  [PASS] Tonnage warning formula present in A13")
     else:
@@ -535,7 +857,7 @@ def test_quote_formulas(wb):
 
     # Check description reference rows
     for row, label in [(23, 'India'), (24, 'Sri Lanka')]:
-        desc_formula = ws.cell(row=row, column=2).value
+        desc_formula = cells.get((row, 2))
         if desc_formula and 'INDEX' in str(desc_formula):
             print(f"  [PASS] Row {row} description INDEX formula present")
         else:
@@ -544,25 +866,19 @@ def test_quote_formulas(wb):
 
     return ok
 
-def test_dropdown_validations(wb):
+def test_dropdown_validations(tool):
     """Test 6: Verify data validation (dropdowns) on input cells."""
-    print("\n" + "=" * 60)
-    print("TEST 6: Dropdown Data Validations")
-    print("=" * 60)
+    print(f"\n{BAR}\nTEST 6: Dropdown Data Validations\n{BAR}")
 
-    ws = wb['Quote']
     ok = True
 
-    validations = list(ws.data_validations.dataValidation)
+    validations = tool.quote.validations
     print(f"  [INFO] Found {len(validations)} data validations")
 
     # Weight dropdown removed — now only 7 dropdowns
     expected_lists = ['SizeList', 'ChipsList', 'ECList', 'PlasticList',
                       'HolesList', 'BSUList', 'DestList']
-    found_lists = set()
-    for dv in validations:
-        if dv.formula1:
-            found_lists.add(dv.formula1.replace('=', ''))
+    found_lists = {formula1.replace('=', '') for formula1 in validations if formula1}
 
     for el in expected_lists:
         if el in found_lists:
@@ -580,33 +896,27 @@ def test_dropdown_validations(wb):
 
     return ok
 
-def test_windows_compatibility(wb):
+def test_windows_compatibility(tool):
     """Test 7: Check for potential Windows Excel compatibility issues."""
-    print("\n" + "=" * 60)
-    print("TEST 7: Windows Excel Compatibility")
-    print("=" * 60)
+    print(f"\n{BAR}\nTEST 7: Windows Excel Compatibility\n{BAR}")
 
     ok = True
-    ws = wb['Quote']
 
-    # Check for Mac-specific formula syntax issues
-    formulas = []
-    for row in range(1, 25):
-        for col in range(1, 12):
-            val = ws.cell(row=row, column=col).value
-            if val and str(val).startswith('='):
-                formulas.append((f"{chr(64+col)}{row}", str(val)))
+    # Check for Mac-specific formula syntax issues (cells are in row order)
+    formulas = [(f"{chr(64+col)}{row}", val)
+                for (row, col), val in tool.quote.cells.items()
+                if row <= 24 and col <= 11 and isinstance(val, str) and val.startswith('=')]
 
     print(f"  [INFO] Checking {len(formulas)} formulas for compatibility...")
 
     issues = []
     for ref, formula in formulas:
-        if ';' in formula:
+        found = {m.upper() for m in COMPAT_RE.findall(formula)}
+        if ';' in found:
             issues.append(f"  {ref}: Contains semicolons (may be locale issue)")
 
-        mac_only = ['WEBSERVICE', 'FILTERXML']
-        for func in mac_only:
-            if func in formula.upper():
+        for func in MAC_ONLY_FUNCS:
+            if func in found:
                 issues.append(f"  {ref}: Uses Mac-specific function {func}")
 
         if len(formula) > 8192:
@@ -620,9 +930,8 @@ def test_windows_compatibility(wb):
             ok = False
 
     # Check named range references don't use Mac-style paths
-    for name in wb.defined_names:
-        ref = wb.defined_names[name].attr_text
-        if 'Macintosh' in ref or '/Users/' in ref:
+    for name, ref in tool.names.items():
+        if MAC_PATH_RE.search(ref):
             print(f"  [FAIL] Named range '{name}' contains Mac path: {ref}")
             ok = False
 
@@ -631,10 +940,8 @@ def test_windows_compatibility(wb):
 
     # Check for formula functions used
     functions_used = set()
-    import re
     for ref, formula in formulas:
-        funcs = re.findall(r'([A-Z]+)\(', formula)
-        functions_used.update(funcs)
+        functions_used.update(FUNC_RE.findall(formula))
 
     safe_functions = {'IF', 'AND', 'OR', 'NOT', 'INDEX', 'MATCH', 'IFERROR'}
     used_other = functions_used - safe_functions
@@ -646,46 +953,31 @@ def test_windows_compatibility(wb):
         print(f"  [PASS] All functions are standard Excel functions")
 
     # Check column K is hidden
-    if ws.column_dimensions['K'].hidden:
+    if 'K' in tool.quote.hidden_cols:
         print(f"  [PASS] Helper column K is hidden")
     else:
         print(f"  [WARN] Helper column K is NOT hidden — helpers will be visible")
 
     return ok
 
-def test_exhaustive_lookups(wb):
+def test_exhaustive_lookups(tool):
     """Test 8: Simulate lookups across ALL products and ALL destinations."""
-    print("\n" + "=" * 60)
-    print("TEST 8: Exhaustive Lookup Coverage")
-    print("=" * 60)
+    print(f"\n{BAR}\nTEST 8: Exhaustive Lookup Coverage\n{BAR}")
 
-    ws_in = wb['IN_GB']
-    ws_sl = wb['SL_GB']
-    ws_fr = wb['Freight']
-
-    in_data = get_sheet_data(ws_in, max_col=24)
-    sl_data = get_sheet_data(ws_sl, max_col=24)
-    fr_data = get_sheet_data(ws_fr, max_col=8)
-
-    weight_tiers = [19.5, 22, 23, 24, 25, 26, 27]
+    def tier_counts(columns):
+        """Non-empty, non-zero values in each tier column."""
+        return [sum(1 for v in col if v is not None and v != 0) for col in columns]
 
     # Count how many products have valid data at each weight tier
     print("\n  --- FOB Price Coverage by Weight Tier ---")
-    for i, wt in enumerate(weight_tiers):
-        in_count = sum(1 for r in in_data if r[17 + i] is not None and r[17 + i] != 0)
-        sl_count = sum(1 for r in sl_data if r[17 + i] is not None and r[17 + i] != 0)
-        in_pcs = sum(1 for r in in_data if r[10 + i] is not None and r[10 + i] != 0)
-        sl_pcs = sum(1 for r in sl_data if r[10 + i] is not None and r[10 + i] != 0)
-        print(f"  {wt:>5} MT: IN FOB={in_count:>3}, IN PCS={in_pcs:>3} | SL FOB={sl_count:>3}, SL PCS={sl_pcs:>3}")
-
-    # Count freight routes per origin
-    origin_dests = {}
-    for r in fr_data:
-        origin = r[2]
-        dest = r[3]
-        if origin not in origin_dests:
-            origin_dests[origin] = set()
-        origin_dests[origin].add(dest)
+    in_fob_counts, in_pcs_counts = tier_counts(tool.in_tiers.fob), tier_counts(tool.in_tiers.pcs)
+    sl_fob_counts, sl_pcs_counts = tier_counts(tool.sl_tiers.fob), tier_counts(tool.sl_tiers.pcs)
+    print("\n".join(
+        f"  {wt:>5} MT: IN FOB={in_fob:>3}, IN PCS={in_pcs:>3} | SL FOB={sl_fob:>3}, SL PCS={sl_pcs:>3}"
+        for wt, in_fob, in_pcs, sl_fob, sl_pcs
+        in zip(WEIGHT_TIERS, in_fob_counts, in_pcs_counts, sl_fob_counts, sl_pcs_counts)))
+
+    origin_dests = tool.freight.dests_by_origin
 
     print(f"\n  --- Freight Route Coverage ---")
     for origin in sorted(origin_dests.keys()):
@@ -699,7 +991,7 @@ def test_exhaustive_lookups(wb):
         print(f"  [INFO] Origins have different destination sets")
 
     # Check for negative ALL IN values
-    bad_freight = [(r[0], r[5]) for r in fr_data if r[5] is not None and r[5] < 0]
+    bad_freight = tool.freight.negative
     if bad_freight:
         print(f"  [WARN] {len(bad_freight)} routes with negative ALL IN freight!")
         for key, all_in in bad_freight[:3]:
@@ -708,88 +1000,58 @@ def test_exhaustive_lookups(wb):
         print(f"  [PASS] No negative freight values")
 
     # Check for zero PCS (would cause division by zero in Freight/Unit)
-    for label, data in [('IN', in_data), ('SL', sl_data)]:
-        zero_pcs = []
-        for r in data:
-            for i in range(7):
-                if r[17 + i] is not None and r[17 + i] != 0:  # has FOB
-                    if r[10 + i] is None or r[10 + i] == 0:    # but no PCS
-                        zero_pcs.append((r[1], weight_tiers[i]))
+    for label, tiers in [('IN', tool.in_tiers), ('SL', tool.sl_tiers)]:
+        zero_pcs = sum(1
+                       for fob_col, pcs_col in zip(tiers.fob, tiers.pcs)
+                       for fob, pcs in zip(fob_col, pcs_col)
+                       if fob is not None and fob != 0      # has FOB
+                       and (pcs is None or pcs == 0))       # but no PCS
         if zero_pcs:
-            print(f"  [WARN] {label}: {len(zero_pcs)} cases where FOB exists but PCS=0 (division by zero risk)")
+            print(f"  [WARN] {label}: {zero_pcs} cases where FOB exists but PCS=0 (division by zero risk)")
             print(f"    Formula uses IFERROR so this will show '-' instead of #DIV/0!")
         else:
             print(f"  [PASS] {label}: No division-by-zero risk (all products with FOB have PCS)")
 
     return True
 
-def test_tonnage_integration(wb):
+def test_tonnage_integration(tool):
     """Test 9: Verify tonnage integration is consistent and complete."""
-    print("\n" + "=" * 60)
-    print("TEST 9: Tonnage Integration")
-    print("=" * 60)
+    print(f"\n{BAR}\nTEST 9: Tonnage Integration\n{BAR}")
 
-    ws_fr = wb['Freight']
-    fr_data = get_sheet_data(ws_fr, max_col=8)
-    weight_tiers = [19.5, 22, 23, 24, 25, 26, 27]
+    freight = tool.freight
 
     ok = True
 
     # Check that all origin rows for the same destination have the same weight
-    dest_weights = {}
-    for r in fr_data:
-        dest = r[3]
-        gross = r[6]
-        confirmed = r[7]
-        if dest not in dest_weights:
-            dest_weights[dest] = (gross, confirmed)
-        else:
-            if dest_weights[dest][0] != gross:
-                print(f"  [FAIL] Destination '{dest}' has inconsistent weights: "
-                      f"{dest_weights[dest][0]} vs {gross}")
-                ok = False
+    for dest, first_gross, gross in freight.inconsistent:
+        print(f"  [FAIL] Destination '{dest}' has inconsistent weights: "
+              f"{first_gross} vs {gross}")
+        ok = False
 
     if ok:
         print(f"  [PASS] All destinations have consistent weight across all origin rows")
 
     # Check that all weights map to a valid tier
-    unmappable = []
-    for r in fr_data:
-        gross = r[6]
-        mapped = False
-        for wt in weight_tiers:
-            if wt <= gross:
-                mapped = True
-        if not mapped:
-            unmappable.append((r[3], gross))
-
+    unmappable = freight.unmappable
     if not unmappable:
         print(f"  [PASS] All gross weights map to a valid tier (>= 19.5 MT)")
     else:
         print(f"  [WARN] {len(unmappable)} routes with weight below minimum tier 19.5:")
-        for dest, gross in unmappable[:5]:
-            print(f"    {dest}: {gross} MT")
-
-    # Report weight distribution
-    weight_counts = {}
-    unique_dests = set()
-    for r in fr_data:
-        dest = r[3]
-        if dest not in unique_dests:
-            unique_dests.add(dest)
-            gross = r[6]
-            confirmed = r[7]
-            label = f"{gross} MT ({'confirmed' if confirmed == 1 else 'default'})"
-            weight_counts[label] = weight_counts.get(label, 0) + 1
-
-    print(f"  [INFO] Weight distribution across {len(unique_dests)} unique destinations:")
-    for label in sorted(weight_counts.keys()):
-        print(f"    {label}: {weight_counts[label]} destinations")
+        print("\n".join(f"    {dest}: {gross} MT" for dest, gross in unmappable[:5]))
+
+    # Report weight distribution (first row of each destination)
+    # Tally (gross, confirmed) pairs; there are only a few, so labels are
+    # formatted per pair rather than per destination
+    weight_counts = Counter()
+    for (gross, confirmed), n in Counter(freight.dest_weights.values()).items():
+        weight_counts[f"{gross} MT ({'confirmed' if confirmed == 1 else 'default'})"] += n
+
+    print(f"  [INFO] Weight distribution across {len(freight.dest_weights)} unique destinations:")
+    if weight_counts:
+        print("\n".join(f"    {label}: {n} destinations" for label, n in sorted(weight_counts.items())))
 
     # Check conditional formatting exists
-    ws_q = wb['Quote']
-    cf_rules = list(ws_q.conditional_formatting)
-    cf_count = len(cf_rules)
+    cf_count = len(tool.quote.cf_ranges)
     print(f"  [INFO] Conditional formatting rules on Quote sheet: {cf_count}")
     if cf_count >= 3:
         print(f"  [PASS] At least 3 conditional formatting rules present (warning row + B11 + result cells)")
@@ -800,54 +1062,69 @@ def test_tonnage_integration(wb):
     return ok
 
 
+# Printed after the summary
+MANUAL_TEST_STEPS = """
+  RECOMMENDED MANUAL TEST IN WINDOWS EXCEL:
+  1. Open Quotation_Tool.xlsx
+  2. On the Quote sheet, select values from all 7 dropdowns
+  3. Verify weight tier auto-populates based on destination
+  4. Verify 3 result rows: Cochin, Tuticorin, Colombo (9 columns each)
+  5. Verify Disc. FOB = FOB × 70% (default 30% discount in B12)
+  6. Verify Total Cost = Disc. FOB + Freight/Unit
+  7. Change B12 discount to 0% — Disc. FOB should equal FOB
+  8. Select a destination with confirmed tonnage — no warning should appear
+  9. Select a destination with default tonnage — red warning banner should appear
+  10. Check that hidden sheets are not visible (right-click sheet tabs)"""
+
+# (summary name, test, critical): a failed critical test stops the run, as the
+# later tests would only report knock-on failures from the same broken workbook
+TESTS = [
+    ("Structure", test_structure, True),
+    ("Named Ranges", test_named_ranges, False),
+    ("Data Integrity", test_data_integrity, False),
+    ("Formula Simulation", test_formula_simulation, False),
+    ("Quote Formulas", test_quote_formulas, False),
+    ("Dropdowns", test_dropdown_validations, False),
+    ("Windows Compat", test_windows_compatibility, False),
+    ("Exhaustive Lookups", test_exhaustive_lookups, False),
+    ("Tonnage Integration", test_tonnage_integration, False),
+]
+
 def main():
-    print("QUOTATION TOOL — COMPREHENSIVE TEST SUITE")
-    print("=" * 60)
-    print(f"File: {TOOL_FILE}\n")
+    parser = argparse.ArgumentParser(description="Test the generated Quotation Tool workbook.")
+    parser.add_argument('--fail-fast', action='store_true',
+                        help="stop after the first test with issues")
+    args = parser.parse_args()
+
+    print(f"QUOTATION TOOL — COMPREHENSIVE TEST SUITE\n{BAR}\nFile: {TOOL_FILE}\n")
 
     try:
-        wb = load_tool()
+        tool = load_tool()
     except Exception as e:
         print(f"[FATAL] Cannot open workbook: {e}")
         sys.exit(1)
 
     results = []
-    results.append(("Structure", test_structure(wb)))
-    results.append(("Named Ranges", test_named_ranges(wb)))
-    results.append(("Data Integrity", test_data_integrity(wb)))
-    results.append(("Formula Simulation", test_formula_simulation(wb)))
-    results.append(("Quote Formulas", test_quote_formulas(wb)))
-    results.append(("Dropdowns", test_dropdown_validations(wb)))
-    results.append(("Windows Compat", test_windows_compatibility(wb)))
-    results.append(("Exhaustive Lookups", test_exhaustive_lookups(wb)))
-    results.append(("Tonnage Integration", test_tonnage_integration(wb)))
-
-    print("\n" + "=" * 60)
-    print("SUMMARY")
-    print("=" * 60)
-    all_pass = True
-    for name, passed in results:
-        status = "PASS" if passed else "ISSUES"
-        print(f"  {name:.<30} {status}")
-        if not passed:
-            all_pass = False
-
+    for name, test, critical in TESTS:
+        passed = test(tool)
+        results.append((name, passed))
+        if critical and not passed:
+            print(f"\n[FATAL] {name} failed — skipping the remaining tests")
+            break
+        if args.fail_fast and not passed:
+            print(f"\n[STOP] {name} had issues — skipping the remaining tests (--fail-fast)")
+            break
+
+    all_pass = all(passed for _, passed in results)
+    summary = [f"\n{BAR}\nSUMMARY\n{BAR}"]
+    summary.extend(f"  {name.ljust(30, '.')} {'PASS' if passed else 'ISSUES'}" for name, passed in results)
+    summary.extend(f"  {name.ljust(30, '.')} SKIPPED" for name, _, _ in TESTS[len(results):])
     if all_pass:
-        print("\n  All tests passed! The tool should work correctly in Windows Excel.")
+        summary.append("\n  All tests passed! The tool should work correctly in Windows Excel.")
     else:
-        print("\n  Some tests had issues — review warnings above.")
-
-    print("\n  RECOMMENDED MANUAL TEST IN WINDOWS EXCEL:")
-    print("  1. Open Quotation_Tool.xlsx")
-    print("  2. On the Quote sheet, select values from all 7 dropdowns")
-    print("  3. Verify weight tier auto-populates based on destination")
-    print("  4. Verify 3 result rows: Cochin, Tuticorin, Colombo (9 columns each)")
-    print("  5. Verify Disc. FOB = FOB × 70% (default 30% discount in B12)")
-    print("  6. Verify Total Cost = Disc. FOB + Freight/Unit")
-    print("  7. Change B12 discount to 0% — Disc. FOB should equal FOB")
-    print("  8. Select a destination with confirmed tonnage — no warning should appear")
-    print("  9. Select a destination with default tonnage — red warning banner should appear")
-    print("  10. Check that hidden sheets are not visible (right-click sheet tabs)")
+        summary.append("\n  Some tests had issues — review warnings above.")
+    summary.append(MANUAL_TEST_STEPS)
+    print("\n".join(summary))
 
 
 if __name__ == '__main__':